@@ -1,42 +1,130 @@
 import minesweeper
 
+from concurrent import futures
+import functools
+import numpy as np
 import sqlite3
 import time
 
 
+# `neighborhood` holds the raw bytes of an int8 array, one byte per cell.
+# TODO: Encode num mines?  Board size?  Undug cell count?
+_CREATE_TABLE_QUERY = """
+    CREATE TABLE IF NOT EXISTS digs(
+        neighborhood blob,
+        result integer
+    );
+"""
+
+# Rows per multi-row INSERT; at two parameters per row, this keeps each
+# statement under SQLite's default limit of 999 bound parameters.
+_INSERT_CHUNK_SIZE = 499
+
+
+@functools.lru_cache
+def _InsertDigsQuery(num_rows):
+    return "INSERT INTO digs VALUES " + ", ".join(["(?, ?)"] * num_rows)
+
+
+def MigrateTextNeighborhoods(db_name):
+    """Rewrites any old CSV-text `neighborhood` values as int8 BLOBs.
+
+    Returns the number of rows rewritten.
+    """
+    conn = sqlite3.connect(db_name)
+    with conn:
+        text_rows = conn.execute(
+            "SELECT rowid, neighborhood FROM digs "
+            "WHERE typeof(neighborhood) = 'text';").fetchall()
+        conn.executemany(
+            "UPDATE digs SET neighborhood = ? WHERE rowid = ?;",
+            [(np.fromstring(csv, dtype=np.int8, sep=",").tobytes(), rowid)
+             for rowid, csv in text_rows])
+    conn.close()
+    return len(text_rows)
+
+
 class DeepMine(object):
 
     def __init__(self, db_name, radius=2):
         self.radius = radius
         self.db_name = db_name
+        # One connection for the agent's lifetime; transactions are explicit.
+        self._conn = sqlite3.connect(db_name, isolation_level=None)
+        # WAL journaling lets the whole game's digs land with one sync:
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA temp_store=MEMORY")
+        self._conn.execute(_CREATE_TABLE_QUERY)
+
+    def close(self):
+        """Closes the agent's connection to its SQLite database."""
+        self._conn.close()
 
     def MineProbability(self, neighborhood, total_mines, flag_count):
         """Return a probability that this neighborhood's center is a mine."""
-        raise NotImplentedError("MineProbability not implemented for " +
-                                self.__class__.__name__)
+        neighborhoods = np.asarray([neighborhood], dtype=np.int8)
+        return float(self.MineProbabilityBatch(neighborhoods, total_mines)[0])
 
-    def PlayGame(self, ms_game, verbose=True, fps=None):
-        """Play a MinesweeperGame until victory or death.  Records results."""
-        neighborhoods = []
-        results = []
+    def MineProbabilityBatch(self, neighborhoods, total_mines):
+        """Return probabilities that each neighborhood's center is a mine.
+
+        `neighborhoods` is an int8 array with one row-major neighborhood per
+        row; the result is a float array with one probability per row.
+        Subclasses can override either this or `MineProbability`.
+        """
+        if type(self).MineProbability is DeepMine.MineProbability:
+            raise NotImplementedError(
+                "MineProbabilityBatch not implemented for " +
+                self.__class__.__name__)
+        return np.fromiter(
+            (self.MineProbability(neighborhood, total_mines, 0)
+             for neighborhood in neighborhoods),
+            dtype=np.float64, count=len(neighborhoods))
+
+    def ChooseDig(self, ms_game, total_mines):
+        """Returns (row, col, neighborhood) with the lowest mine probability.
+
+        Only undug cells are considered; digging anywhere else is fatal.
+        Raises ValueError if there are none.
+        """
+        candidates = ms_game.UndugCells()
+        if not candidates:
+            raise ValueError("No undug cells left to dig")
+        candidate_neighborhoods = np.empty(
+            (len(candidates), (2 * self.radius + 1) ** 2), dtype=np.int8)
+        for i, (row, col) in enumerate(candidates):
+            candidate_neighborhoods[i] = ms_game.Neighborhood(
+                row, col, self.radius)
+        probs = self.MineProbabilityBatch(candidate_neighborhoods, total_mines)
+        best = int(probs.argmin())
+        return (*candidates[best], candidate_neighborhoods[best])
+
+    def _PlayMoves(self, ms_game, verbose, fps):
+        """Plays ms_game to the end and returns what each dig saw.
+
+        Returns a (num_digs, K) int8 array of the neighborhoods dug, and a
+        bytearray holding each dig's result.
+        """
+        # Grows by doubling; only the first len(results) rows are filled.
+        neighborhoods = np.empty((16, (2 * self.radius + 1) ** 2),
+                                 dtype=np.int8)
+        results = bytearray()
         move = 1
         total_mines = ms_game.NumMinesTotal()
-        while not ms_game.Dead() and not ms_game.Won():
+        game_over = ms_game.Dead() or ms_game.Won()
+        while not game_over:
             # No current support for planting flags.
-            min_prob = 1
-            best_spot = None
-            for row in range(ms_game.num_rows):
-                for col in range(ms_game.num_cols):
-                    neighborhood = ms_game.Neighborhood(row, col)
-                    prob = self.MineProbability(neighborhood, total_mines, 0)
-                    if prob <= min_prob:
-                        min_prob = prob
-                        best_spot = (row, col)
-            br, bc = best_spot
-            neighborhoods.append(ms_game.Neighborhood(br, bc))
+            br, bc, neighborhood = self.ChooseDig(ms_game, total_mines)
+            if len(results) == len(neighborhoods):
+                neighborhoods = np.concatenate(
+                    [neighborhoods, np.empty_like(neighborhoods)])
+            neighborhoods[len(results)] = neighborhood
             result = ms_game.Dig(br, bc)
             # A result of 1 means you died.  Dig returns False if you die.
             results.append(0 if result else 1)
+            # No need to ask Dead(); you can only win a dig you survived.
+            game_over = not result or ms_game.Won()
             if verbose:
                 print("\nMove %d: (%d, %d)\n" % (move, br, bc))
                 if not result:
@@ -46,21 +134,72 @@ class DeepMine(object):
                 if fps is not None:
                     time.sleep(fps)
             move += 1
-        # Save neighbs, results to sqlite
-        sql_values = [(",".join([str(n) for n in neighborhood]), result)
-                      for neighborhood, result in zip(neighborhoods, results)]
-        conn = sqlite3.connect(self.db_name)
-        curr = conn.cursor()
-        # TODO: `neighborhood` takes 20% as much space if i do a crazy integer
-        # format and then save as hex.  See how much data this actually
-        # generates and see if that 5x shrinkage is worth the effort.
-        # TODO: Encode num mines?  Board size?  Undug cell count?
-        curr.execute("""
-            CREATE TABLE IF NOT EXISTS digs(
-                neighborhood text,
-                result integer
-            );""")
-        curr.executemany("INSERT INTO digs VALUES (?, ?)",
-            sql_values)
-        conn.commit()
-        conn.close()
+        return neighborhoods[:len(results)], results
+
+    def _RecordDigs(self, neighborhoods, results):
+        self._conn.execute("BEGIN")
+        try:
+            for start in range(0, len(results), _INSERT_CHUNK_SIZE):
+                stop = start + _INSERT_CHUNK_SIZE
+                chunk_results = results[start:stop]
+                params = [value
+                          for neighborhood, result in zip(
+                              neighborhoods[start:stop], chunk_results)
+                          for value in (neighborhood.tobytes(), result)]
+                self._conn.execute(
+                    _InsertDigsQuery(len(chunk_results)), params)
+            self._conn.execute("COMMIT")
+        except BaseException:
+            # Don't leave the agent's connection stuck mid-transaction:
+            if self._conn.in_transaction:
+                self._conn.execute("ROLLBACK")
+            raise
+
+    def PlayGame(self, ms_game, verbose=False, fps=None):
+        """Play a MinesweeperGame until victory or death.  Records results."""
+        self._RecordDigs(*self._PlayMoves(ms_game, verbose, fps))
+
+    def PlayGames(self, num_games, game_factory, n_jobs=1):
+        """Plays `num_games` fresh games, recording them in one transaction.
+
+        Args:
+            num_games: How many games to play.
+            game_factory: Called with no arguments to make each new
+                MinesweeperGame, e.g. `minesweeper.MinesweeperGame.Beginner`.
+                Must be picklable when `n_jobs` is greater than one.
+            n_jobs: How many worker processes to simulate games in.  The games
+                are independent, so this scales until SQLite writes dominate.
+        """
+        if n_jobs <= 1:
+            neighborhoods, results = _PlayGamesWorker(
+                self, num_games, game_factory)
+        else:
+            chunk_sizes = [num_games // n_jobs + (1 if i < num_games % n_jobs
+                                                  else 0)
+                           for i in range(n_jobs)]
+            with futures.ProcessPoolExecutor(max_workers=n_jobs) as executor:
+                chunks = list(executor.map(
+                    _PlayGamesWorker,
+                    [self] * n_jobs, chunk_sizes, [game_factory] * n_jobs))
+            neighborhoods = np.concatenate([chunk[0] for chunk in chunks])
+            results = b"".join(chunk[1] for chunk in chunks)
+        self._RecordDigs(neighborhoods, results)
+
+    def __getstate__(self):
+        # Agents shipped to PlayGames workers only play; they never record.
+        state = self.__dict__.copy()
+        del state["_conn"]
+        return state
+
+
+def _PlayGamesWorker(agent, num_games, game_factory):
+    """Plays `num_games` quietly; returns all their neighborhoods and results.
+    """
+    neighborhoods = [np.empty((0, (2 * agent.radius + 1) ** 2), dtype=np.int8)]
+    results = bytearray()
+    for _ in range(num_games):
+        game_neighborhoods, game_results = agent._PlayMoves(
+            game_factory(), False, None)
+        neighborhoods.append(game_neighborhoods)
+        results += game_results
+    return np.concatenate(neighborhoods), results
@@ -0,0 +1,56 @@
+"""Turns recorded dig neighborhoods into model features.
+
+Neighborhoods are stored as the raw bytes of int8 arrays (see `deep_mine`).
+"""
+
+import minesweeper
+
+import functools
+import numpy as np
+
+
+# OUT_OF_BOUNDS is the lowest-valued cell-contents code seen before a dig
+_OOB = int(minesweeper.CellValue.OUT_OF_BOUNDS)
+
+# How many cell-contents codes that leaves, from OUT_OF_BOUNDS up through 8:
+_CELL_ALPHABET = 8 - _OOB + 1
+
+
+def NumOneHotColumns(neighborhood_size):
+    return _CELL_ALPHABET * neighborhood_size
+
+
+@functools.lru_cache
+def _SparseLut(neighborhood_size):
+    """Table of one-hot column IDs, and the cell positions to index it with.
+
+    `lut[i, code - _OOB]` is the column for cell `i` holding `code`; each cell
+    gets its own block of `_CELL_ALPHABET` columns.
+    """
+    positions = np.arange(neighborhood_size, dtype=np.int32)
+    lut = (_CELL_ALPHABET * positions[:, None] +
+           np.arange(_CELL_ALPHABET, dtype=np.int32)[None, :])
+    lut.flags.writeable = False
+    positions.flags.writeable = False
+    return lut, positions
+
+
+def FeaturizeNeighborhoodDense(neighborhood_blob):
+    return np.frombuffer(neighborhood_blob, dtype=np.int8).tolist()
+
+
+def FeaturizeNeighborhoodSparse(neighborhood_blob):
+    """Returns list of active/one-hot column IDs."""
+    cells = np.frombuffer(neighborhood_blob, dtype=np.int8)
+    lut, positions = _SparseLut(cells.size)
+    return lut[positions, cells - _OOB].tolist()
+
+
+def OneHotColumns(neighborhoods):
+    """Active column IDs for an (N, K) int8 array of neighborhoods.
+
+    Returns an (N * K,) int32 array, row-major, so that each group of K entries
+    matches `FeaturizeNeighborhoodSparse` for the corresponding row.
+    """
+    lut, positions = _SparseLut(neighborhoods.shape[1])
+    return lut[positions, neighborhoods.astype(np.int32) - _OOB].ravel()
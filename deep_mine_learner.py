@@ -1,62 +1,119 @@
 import deep_mine
-import minesweeper
+import deep_mine_features
 
-from scipy import sparse
+import functools
+import numpy as np
+import random
 
 
-def FeaturizeNeighborhoodDense(neighborhood_csv):
-    return [int(n) for n in neighborhood_csv.split(",")]
+# Stay under SQLite's default limit on bound parameters per statement:
+_MAX_SQL_VARIABLES = 999
 
-
-def FeaturizeNeighborhoodSparse(neighborhood_csv):
-    """Returns list of active/one-hot column IDs."""
-    cell_values = [int(n) for n in neighborhood_csv.split(",")]
-    # OUT_OF_BOUNDS is the lowest-valued cell-contents code
-    return [(12 * i) + ci + int(minesweeper.CellValue.OUT_OF_BOUNDS)
-            for i, ci in enumerate(cell_values)]
+# Distinct (neighborhood, total_mines) scores remembered during one game:
+_SCORE_CACHE_SIZE = 100_000
 
 
 class DeepMineLearner(deep_mine.DeepMine):
     """Another abstract class, this time for miners that can learn."""
 
     def __init__(self, db_name, radius=2, one_hot_features=False):
-        super.__init__(db_name, radius)
+        super().__init__(db_name, radius)
         self.one_hot = one_hot_features
+        self._ResetScoreCache()
+
+    def _Score(self, neighborhood, total_mines):
+        """Return a probability that this neighborhood's center is a mine.
+
+        `neighborhood` is a tuple, so results can be cached by it; see
+        `MineProbability`.
+        """
+        raise NotImplementedError("_Score not implemented for " +
+                                  self.__class__.__name__)
+
+    def _ResetScoreCache(self):
+        self._cached_score = functools.lru_cache(maxsize=_SCORE_CACHE_SIZE)(
+            self._Score)
+
+    def MineProbability(self, neighborhood, total_mines, flag_count):
+        # The same few neighborhoods show up over and over, so only score
+        # each one once per game:
+        return self._cached_score(tuple(neighborhood), total_mines)
+
+    def MineProbabilityBatch(self, neighborhoods, total_mines):
+        return np.fromiter(
+            (self._cached_score(tuple(neighborhood), total_mines)
+             for neighborhood in neighborhoods.tolist()),
+            dtype=np.float64, count=len(neighborhoods))
+
+    def _PlayMoves(self, ms_game, verbose, fps):
+        # The model may have been retrained since the last game:
+        self._ResetScoreCache()
+        return super()._PlayMoves(ms_game, verbose, fps)
+
+    def __getstate__(self):
+        state = super().__getstate__()
+        del state["_cached_score"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._ResetScoreCache()
 
     def GetTrainingData(self, max_examples):
         """Turns Dig History table into (X, y) training data pair.
 
-        Depending on self.one_hot, X is either a CSC matrix or a list-of-lists.
+        Depending on self.one_hot, X is either a CSC matrix or an (N, K) int8
+        array of neighborhoods; y is an int8 array of dig results.
         """
-        conn = sqlite3.connect(self.db_name)
-        curr = conn.cursor()
-        curr.execute("SELECT COUNT(1) FROM digs;")
-        num_rows = curr.fetchone()[0]
-        if num_rows < max_examples:
-            query = "SELECT neighborhood, result FROM digs;"
-            num_examples = num_rows
+        curr = self._conn.cursor()
+        # SQLite has to scan the table for COUNT(1); MAX(rowid) is one probe,
+        # and can only overcount rows.
+        max_rowid = curr.execute(
+            "SELECT MAX(rowid) FROM digs;").fetchone()[0] or 0
+        if max_rowid <= max_examples:
+            rows = curr.execute(
+                "SELECT neighborhood, result FROM digs;").fetchall()
         else:
-            # (wincing)
-            query = """SELECT neighborhood, result FROM digs
-                        ORDER BY RANDOM() LIMIT %d""" % (max_examples,)
-            num_examples = max_examples
-        if self.one_hot:
-            rows = []
-            cols = []
-            data = []
-            y = []
-            row = 0
-            for neigh, result in curr.execute(query):
-                y.append(result)
-                col_ids = FeaturizeNeighborhoodSparse(neigh)
-                cols.extend(col_ids)
-                rows.extend([row for _ in col_ids])
-                data.extend([1 for _ in col_ids])
-            X = sparse.csc_matrix((data, (rows, cols)))
-            return (X, y)
-        X = []
-        y = []
-        for neigh, result in curr.execute(query):
-            X.append(FeaturizeNeighborhoodDense(neigh))
-            y.append(result)
+            rows = self._SampleDigs(curr, max_examples, max_rowid)
+        num_examples = len(rows)
+        neighborhood_size = (2 * self.radius + 1) ** 2
+        y = np.fromiter((result for _, result in rows), dtype=np.int8,
+                        count=num_examples)
+        neigh = np.frombuffer(
+            b"".join(blob for blob, _ in rows), dtype=np.int8).reshape(
+                num_examples, neighborhood_size)
+        if not self.one_hot:
+            return neigh, y
+        # Only the one-hot path needs SciPy; don't make every miner import it.
+        from scipy import sparse
+        cols = deep_mine_features.OneHotColumns(neigh)
+        rows_idx = np.repeat(
+            np.arange(num_examples, dtype=np.int32), neighborhood_size)
+        data = np.ones(num_examples * neighborhood_size, dtype=np.int8)
+        num_cols = deep_mine_features.NumOneHotColumns(neighborhood_size)
+        X = sparse.coo_matrix(
+            (data, (rows_idx, cols)), shape=(num_examples, num_cols)).tocsc()
         return X, y
+
+    def _SampleDigs(self, curr, num_examples, max_rowid):
+        """Fetches `num_examples` distinct random rows from the digs table.
+
+        Draws rowids client-side and looks them up by primary key, rather than
+        having SQLite sort the whole table by RANDOM().  Keeps drawing until it
+        has enough rows, in case rowids have gaps from deleted rows.
+        """
+        undrawn = range(1, max_rowid + 1)
+        rows = []
+        while len(rows) < num_examples and undrawn:
+            ids = random.sample(
+                undrawn, min(num_examples - len(rows), len(undrawn)))
+            for start in range(0, len(ids), _MAX_SQL_VARIABLES):
+                chunk = ids[start:start + _MAX_SQL_VARIABLES]
+                rows.extend(curr.execute(
+                    "SELECT neighborhood, result FROM digs WHERE rowid IN (%s);"
+                    % (",".join("?" * len(chunk)),), chunk))
+            if len(rows) < num_examples:
+                # Some ids were gaps; refill from the ones not yet drawn.
+                drawn = set(ids)
+                undrawn = [rowid for rowid in undrawn if rowid not in drawn]
+        return rows
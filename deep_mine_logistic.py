@@ -0,0 +1,48 @@
+import deep_mine_features
+import deep_mine_learner
+import deep_mine_numba
+import minesweeper
+
+import numpy as np
+from sklearn import linear_model
+
+
+class DeepMineLogistic(deep_mine_learner.DeepMineLearner):
+    """A miner scoring one-hot neighborhoods with logistic regression."""
+
+    def __init__(self, db_name, radius=2):
+        super().__init__(db_name, radius, one_hot_features=True)
+        # An untrained model thinks every cell is equally risky.
+        self.weights = np.zeros(
+            deep_mine_features.NumOneHotColumns((2 * radius + 1) ** 2))
+        self.bias = 0.0
+
+    def Train(self, max_examples):
+        """Fits the model to (up to) `max_examples` recorded digs."""
+        X, y = self.GetTrainingData(max_examples)
+        model = linear_model.LogisticRegression()
+        model.fit(X, y)
+        self.weights = model.coef_[0]
+        self.bias = float(model.intercept_[0])
+
+    def _Score(self, neighborhood, total_mines):
+        cols = deep_mine_features.FeaturizeNeighborhoodSparse(
+            np.asarray(neighborhood, dtype=np.int8).tobytes())
+        return float(1 / (1 + np.exp(-(self.bias + self.weights[cols].sum()))))
+
+    def ChooseDig(self, ms_game, total_mines):
+        # The sigmoid is monotonic, so the lowest linear score is also the
+        # lowest mine probability; let the compiled kernel find it.
+        board = np.frombuffer(ms_game.board, dtype=np.int8).reshape(
+            ms_game.num_rows, ms_game.num_cols)
+        row, col = deep_mine_numba.BestCell(
+            board, self.weights, self.bias, self.radius)
+        return row, col, ms_game.Neighborhood(row, col, self.radius)
+
+
+if __name__ == "__main__":
+    lou_gistic = DeepMineLogistic("./deep_mine.db")
+    lou_gistic.Train(max_examples=100_000)
+    ms_game = minesweeper.MinesweeperGame.Beginner()
+    lou_gistic.PlayGame(ms_game, verbose=True, fps=0.7)
+    lou_gistic.close()
@@ -0,0 +1,61 @@
+"""Numba-compiled kernels for DeepMine agents whose scores are arithmetic.
+
+These skip the per-cell Python calls in `DeepMine.ChooseDig` by scanning the
+whole board -- neighborhood extraction, one-hot lookup, and argmin -- in one
+compiled loop.
+"""
+
+import deep_mine_features
+import minesweeper
+
+import numba
+import numpy as np
+
+
+# The one-hot layout has to match the featurizer the weights were trained on,
+# so take its constants rather than restating them.  (Numba freezes module
+# globals like these into the compiled code.)
+_OOB = deep_mine_features._OOB
+_CELL_ALPHABET = deep_mine_features._CELL_ALPHABET
+_UNKNOWN = int(minesweeper.CellValue.UNKNOWN)
+
+
+@numba.njit(cache=True)
+def BestCell(board, weights, bias, radius):
+    """Returns the (row, col) of the undug cell with the lowest linear score.
+
+    Args:
+        board: An int8 array of shape (num_rows, num_cols) of cell values.
+        weights: One weight per one-hot neighborhood column, laid out as in
+            `deep_mine_features.FeaturizeNeighborhoodSparse`.
+        bias: Added to every cell's score.
+        radius: Neighborhood radius the weights were trained with.
+
+    Raises ValueError if there are no undug cells, as `DeepMine.ChooseDig`
+    does.
+    """
+    num_rows, num_cols = board.shape
+    best_score = np.inf
+    best_row = -1
+    best_col = -1
+    for row in range(num_rows):
+        for col in range(num_cols):
+            if board[row, col] != _UNKNOWN:
+                continue
+            score = bias
+            i = 0
+            for drow in range(row - radius, row + radius + 1):
+                for dcol in range(col - radius, col + radius + 1):
+                    if 0 <= drow < num_rows and 0 <= dcol < num_cols:
+                        cell = board[drow, dcol]
+                    else:
+                        cell = _OOB
+                    score += weights[_CELL_ALPHABET * i + cell - _OOB]
+                    i += 1
+            if score < best_score:
+                best_score = score
+                best_row = row
+                best_col = col
+    if best_row < 0:
+        raise ValueError("No undug cells left to dig")
+    return best_row, best_col
@@ -1,17 +1,28 @@
 import deep_mine
 import minesweeper
 
-import random
+import numpy as np
 
 
 class DeepMineRandom(deep_mine.DeepMine):
     """A miner that guesses completely at random."""
 
-    def MineProbability(self, neighborhood, total_mines, flag_count):
-        return random.random()
+    def __init__(self, db_name, radius=2, seed=None):
+        super().__init__(db_name, radius)
+        self._rng = np.random.default_rng(seed)
+
+    def MineProbabilityBatch(self, neighborhoods, total_mines):
+        # One C-level draw for the whole board, rather than one per cell.
+        return self._rng.random(neighborhoods.shape[0])
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        # Each PlayGames worker gets its own stream of guesses:
+        self._rng = np.random.default_rng()
 
 
 if __name__ == "__main__":
     crazy_ivan = DeepMineRandom("./deep_mine.db")
-    ms_game = minesweeper.BeginnerGame()
-    crazy_ivan.PlayGame(ms_game, fps=0.7)
+    ms_game = minesweeper.MinesweeperGame.Beginner()
+    crazy_ivan.PlayGame(ms_game, verbose=True, fps=0.7)
+    crazy_ivan.close()
@@ -9,29 +9,51 @@ This was useful when testing the bot live in production.  Wiping up messes.
 
 import sys
 import sqlite3
-import time
 
-from mastodon import Mastodon
+from concurrent import futures
+
+from mastodon import Mastodon, MastodonNotFoundError
+
+
+# Deletes are all network wait, so a few can be in flight at once:
+_MAX_WORKERS = 8
+
+
+def delete_post(md: Mastodon, post_id: int) -> int:
+    """Deletes one post, if it's not already gone."""
+    try:
+        md.status_delete(post_id)
+    except MastodonNotFoundError:
+        # Deleted by an earlier run that stopped partway through.
+        pass
+    return post_id
+
 
 def main():
     db_filename = sys.argv[1]
     db_conn = sqlite3.connect(db_filename)
     db_cursor = db_conn.cursor()
-    # Set up the Mastodon client:
+    # Set up the Mastodon client.  Deletes are heavily rate limited, so each
+    # worker sleeps until the limit resets whenever it runs out:
     mdn_creds_filename = sys.argv[2]
-    md = Mastodon(access_token=mdn_creds_filename)
+    md = Mastodon(access_token=mdn_creds_filename, ratelimit_method="wait")
 
+    # Hold the write lock from reading the posts through dropping the table,
+    # so no new posts sneak in while we're deleting.
+    db_cursor.execute("BEGIN IMMEDIATE;")
     db_cursor.execute("SELECT post_id FROM games ORDER BY post_id;")
     post_ids = [int(row[0]) for row in db_cursor]
-    for row_id, post_id in enumerate(post_ids):
-        print(f"Deletion {row_id} / {len(post_ids)}: {post_id}")
-        md.status_delete(post_id)
-        time.sleep(1)
+    with futures.ThreadPoolExecutor(max_workers=_MAX_WORKERS) as executor:
+        deleted = executor.map(lambda post_id: delete_post(md, post_id),
+                               post_ids)
+        for row_id, post_id in enumerate(deleted):
+            print(f"Deletion {row_id} / {len(post_ids)}: {post_id}")
     db_cursor.execute("DROP TABLE games;")
+    db_cursor.execute("DROP TABLE IF EXISTS game_snapshots;")
 
     db_conn.commit()
     db_conn.close()
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -36,12 +36,11 @@ from __future__ import annotations
 
 import dataclasses
 import enum
+import os
 import random
 import sqlite3
 import sys
-import time
-
-from mastodon import Mastodon
+from typing import Iterable, Optional
 
 import minesweeper
 
@@ -65,14 +64,79 @@ _CREATE_TABLE_QUERY = """
     );
 """
 
+# The visible board after each move, so loading a game needn't replay it.
+# `board` holds `MinesweeperGame.Snapshot()` bytes.
+_CREATE_SNAPSHOT_TABLE_QUERY = """
+    CREATE TABLE IF NOT EXISTS game_snapshots (
+        game_id INTEGER,
+        move_id INTEGER,
+        board BLOB NOT NULL,
+        dug_count INTEGER NOT NULL,
+        flag_count INTEGER NOT NULL,
+        dead INTEGER NOT NULL,
+        PRIMARY KEY(game_id, move_id)
+    );
+"""
+
+_SAVE_SNAPSHOT_QUERY = """
+    INSERT OR REPLACE INTO game_snapshots (
+        game_id, move_id, board, dug_count, flag_count, dead)
+    VALUES (?, ?, ?, ?, ?, ?);
+"""
+
+_LOAD_SNAPSHOT_QUERY = """
+    SELECT board, dug_count, flag_count, dead
+    FROM game_snapshots
+    WHERE game_id = ? AND move_id = ?;
+"""
+
+# This job is the DB's only writer, and commits once per run: WAL journaling
+# with NORMAL sync keeps that commit off the fsync path.
+_CONNECTION_PRAGMAS = """
+    PRAGMA journal_mode=WAL;
+    PRAGMA synchronous=NORMAL;
+    PRAGMA temp_store=MEMORY;
+    PRAGMA mmap_size=67108864;
+    PRAGMA cache_size=-4000;
+"""
+
 _UPDATE_STATE_QUERY = """
     INSERT INTO games (
         game_id, move_id, command, gridpoint_row, gridpoint_col, post_id)
     VALUES (?, ?, ?, ?, ?, ?);
 """
 
-# The moves from the latest game, in play order.
-_LATEST_GAME_QUERY = """
+# The most recent move of the most recent game.  Both this and
+# `_GAME_MOVES_QUERY` walk the (game_id, move_id) primary key index in order.
+_LATEST_MOVE_QUERY = """
+    SELECT
+        game_id,
+        move_id,
+        command,
+        gridpoint_row,
+        gridpoint_col,
+        post_id
+    FROM games
+    ORDER BY game_id DESC, move_id DESC
+    LIMIT 1;
+"""
+
+# The moves from the given game, in play order.
+# The same sanity checks `_replay_moves` makes, for when there's a snapshot to
+# restore instead: all in one pass, without fetching the moves themselves.
+_CHECK_GAME_MOVES_QUERY = """
+    SELECT
+        COUNT(*),
+        COUNT(DISTINCT move_id),
+        MIN(move_id),
+        MAX(move_id),
+        SUM(LOWER(command) NOT IN ('new', 'dig', 'flag')),
+        SUM((move_id = 0) != (LOWER(command) = 'new'))
+    FROM games
+    WHERE game_id = ?;
+"""
+
+_GAME_MOVES_QUERY = """
     SELECT
         game_id,
         move_id,
@@ -81,7 +145,7 @@ _LATEST_GAME_QUERY = """
         gridpoint_col,
         post_id
     FROM games
-    WHERE game_id = ( SELECT MAX(game_id) FROM games )
+    WHERE game_id = ?
     ORDER BY move_id;
 """
 
@@ -107,6 +171,20 @@ class Command(enum.Enum):
     FLAG = 'FLAG'
 
 
+# The DB stores commands by lower-cased name:
+_COMMAND_BY_NAME = {command.name.lower(): command for command in Command}
+
+# How to apply each kind of move to a game:
+_APPLY_MOVE = {
+    Command.DIG: minesweeper.MinesweeperGame.Dig,
+    Command.FLAG: minesweeper.MinesweeperGame.PlantFlag,
+}
+
+# The bot's random guesses; seeded from OS entropy, separately from the games'
+# seeded mine placement.
+_move_rng = random.Random()
+
+
 @dataclasses.dataclass(frozen=True)
 class GameState:
     """A game's state of play."""
@@ -140,24 +218,62 @@ def load_game_state(
     Returns:
         A game state, ready for next
     """
-    db_cursor.execute(_LATEST_GAME_QUERY)  # Note: this ORDERS BY move_id
-    rows = db_cursor.fetchall()
-    game = None
-    game_id = None
-    if not rows:
-        game = minesweeper.MinesweeperGame.Beginner(
-            seed=game_seed(db_filename=db_filename, game_id=game_id))
-        return GameState(
-            game=game, game_id=1, move_id=(-1), post_id="")
-    for expected_move_id, row in enumerate(rows):
-        row_game_id, move_id, cmd_str, g_row, g_col, post_id = row
+    latest_move = db_cursor.execute(_LATEST_MOVE_QUERY).fetchone()
+    if latest_move is None:
+        return _new_game_state(db_filename, game_id=1)
+    game_id, move_id, _, _, _, post_id = latest_move
+    assert post_id.isdigit()
+    game = minesweeper.MinesweeperGame.Beginner(
+        seed=game_seed(db_filename=db_filename, game_id=game_id))
+    # If the last move's board was saved, there's no need to replay the moves:
+    snapshot = db_cursor.execute(
+        _LOAD_SNAPSHOT_QUERY, (game_id, move_id)).fetchone()
+    if snapshot is not None:
+        _check_game_moves(db_cursor, game_id, move_id)
+        game.Restore(*snapshot)
+    else:
+        _replay_moves(db_cursor, game, game_id)
+    if game.Dead() or game.Won():
+        return _new_game_state(db_filename, game_id=(game_id + 1))
+    return GameState(
+        game=game, game_id=game_id, move_id=move_id, post_id=post_id)
+
+
+def _new_game_state(db_filename: str, game_id: int) -> GameState:
+    """State of a game that's yet to have its first move."""
+    game = minesweeper.MinesweeperGame.Beginner(
+        seed=game_seed(db_filename=db_filename, game_id=game_id))
+    return GameState(game=game, game_id=game_id, move_id=(-1), post_id="")
+
+
+def _check_game_moves(db_cursor: sqlite3.Cursor, game_id: int,
+                      move_id: int) -> None:
+    """Ensures the game's moves are 0 through `move_id`, starting with NEW."""
+    (num_moves, num_move_ids, min_move_id, max_move_id, num_bad_commands,
+     num_misplaced_news) = db_cursor.execute(
+        _CHECK_GAME_MOVES_QUERY, (game_id,)).fetchone()
+    # Ensure the move IDs are consecutive integers starting at 0:
+    if (num_moves != move_id + 1 or num_move_ids != num_moves
+            or min_move_id != 0 or max_move_id != move_id):
+        raise ValueError(
+            f"Expected move IDs 0 through {move_id} for game {game_id}, but "
+            f"got {num_move_ids} distinct IDs from {min_move_id} to "
+            f"{max_move_id}")
+    if num_bad_commands:
+        raise ValueError(f"Found {num_bad_commands} unrecognized commands")
+    # The first move ("move 0") is always a no-op of NEW, and only it is:
+    if num_misplaced_news:
+        raise ValueError("Move 0, and only move 0, must have command NEW")
+
+
+def _replay_moves(db_cursor: sqlite3.Cursor,
+                  game: minesweeper.MinesweeperGame,
+                  game_id: int) -> None:
+    """Applies every move recorded for the game to the fresh `game`."""
+    db_cursor.execute(_GAME_MOVES_QUERY, (game_id,))
+    for expected_move_id, row in enumerate(db_cursor.fetchall()):
+        _, move_id, cmd_str, g_row, g_col, post_id = row
         assert post_id.isdigit()
-        if game_id is None:
-            game_id = row_game_id
-            game = minesweeper.MinesweeperGame.Beginner(
-                seed=game_seed(db_filename=db_filename, game_id=game_id))
-        else:
-            assert game_id == row_game_id
         # Ensure the move IDs are consecutive integers starting at 0:
         if move_id != expected_move_id:
             raise ValueError(
@@ -165,9 +281,8 @@ def load_game_state(
                 f"but got a row like {row}"
             )
         # Parse the command into the nice enum version:
-        try:
-            command = Command[cmd_str.upper()]
-        except KeyError:
+        command = _COMMAND_BY_NAME.get(cmd_str.lower())
+        if command is None:
             raise ValueError(f"Unrecognized command in row {row}")
         # The first move ("move 0") is always a no-op of NEW:
         if move_id == 0:
@@ -176,24 +291,15 @@ def load_game_state(
             continue
         assert command is not Command.NEW
         apply_move(game, command, gridpoint_row=g_row, gridpoint_col=g_col)
-    if game.Dead() or game.Won():
-        game = minesweeper.MinesweeperGame.Beginner(
-            seed=game_seed(db_filename=db_filename, game_id=game_id))
-        return GameState(
-            game=game, game_id=(game_id + 1), move_id=(-1), post_id="")
-    return GameState(
-        game=game, game_id=game_id, move_id=move_id, post_id=post_id)
 
 
 def apply_move(ms_game: minesweeper.MinesweeperGame, command: Command,
                gridpoint_row: int, gridpoint_col: int) -> None:
     """Updates ms_game according to given command."""
-    if command is Command.DIG:
-        ms_game.Dig(gridpoint_row, gridpoint_col)
-    elif command is Command.FLAG:
-        ms_game.PlantFlag(gridpoint_row, gridpoint_col)
-    else:
+    move_fn = _APPLY_MOVE.get(command)
+    if move_fn is None:
         raise ValueError(f"Unsupported apply_move command: {command}")
+    move_fn(ms_game, gridpoint_row, gridpoint_col)
 
 
 def parse_move_from_post(post_contents: str) -> Optional[GameMove]:
@@ -213,12 +319,11 @@ def calculate_next_move(game_state: GameState) -> GameMove:
         return GameMove(command=Command.NEW, move_maker="",
                         gridpoint_row=0, gridpoint_col=0)
     # TODO: Try to load and parse replies to bot's previous post.
-    random.seed(time.time())
     return GameMove(
-        command=(Command.DIG if random.random() < 0.8 else Command.FLAG),
+        command=(Command.DIG if _move_rng.random() < 0.8 else Command.FLAG),
         move_maker="The bot, guessing at random,",
-        gridpoint_row=random.randint(0, 7),
-        gridpoint_col=random.randint(0, 7))
+        gridpoint_row=_move_rng.randint(0, 7),
+        gridpoint_col=_move_rng.randint(0, 7))
 
 
 def welcome_post_contents(game_state: GameState) -> str:
@@ -260,29 +365,84 @@ def get_post_contents(game_state: GameState, move: GameMove) -> str:
     return move_result_post_contents(game_state, move)
 
 
+def _game_state_row(game_id: int, move_id: int, move: GameMove,
+                    post_id: str) -> tuple:
+    """The `_UPDATE_STATE_QUERY` parameters recording this move."""
+    return (game_id, move_id, move.command.name.lower(),
+            move.gridpoint_row, move.gridpoint_col, post_id)
+
+
 def update_game_state(db_cursor: sqlite3.Cursor,
                       game_id: int,
                       move_id: int,
                       move: GameMove,
                       post_id: str) -> None:
-    """Updates the DB's game state table with the latest move."""
+    """Updates the DB's game state table with the latest move.
+
+    This doesn't commit; the caller decides when the transaction ends.
+    """
     db_cursor.execute(
-        _UPDATE_STATE_QUERY,
-        (game_id, move_id, move.command.name.lower(),
-         move.gridpoint_row, move.gridpoint_col, post_id)
-    )
+        _UPDATE_STATE_QUERY, _game_state_row(game_id, move_id, move, post_id))
+
+
+def save_game_snapshot(db_cursor: sqlite3.Cursor,
+                       game_id: int,
+                       move_id: int,
+                       ms_game: minesweeper.MinesweeperGame) -> None:
+    """Saves the board as it stands after this move.  Doesn't commit."""
+    db_cursor.execute(
+        _SAVE_SNAPSHOT_QUERY,
+        (game_id, move_id, ms_game.Snapshot(), ms_game.dug_count,
+         ms_game.NumFlagged(), int(ms_game.Dead())))
+
+
+def update_game_states(
+    db_cursor: sqlite3.Cursor,
+    moves: Iterable[tuple[int, int, GameMove, str]]) -> None:
+    """Records many moves at once, all in a single transaction.
+
+    Either every move is committed or none are.  The transaction is begun
+    here, so don't call this with one already open.
+
+    Args:
+        db_cursor: A cursor pointing to the game state database.
+        moves: (game_id, move_id, move, post_id) tuples, one per move.
+    """
+    db_cursor.execute("BEGIN IMMEDIATE")
+    try:
+        db_cursor.executemany(
+            _UPDATE_STATE_QUERY,
+            (_game_state_row(*game_move) for game_move in moves))
+    except BaseException:
+        db_cursor.execute("ROLLBACK")
+        raise
+    db_cursor.execute("COMMIT")
 
 
 def main():
     # Set up a connection to the SQLite database file:
     db_filename = sys.argv[1]
-    db_conn = sqlite3.connect(db_filename)
+    # Every query is one of the constant strings above, so a small statement
+    # cache holds them all.  Set MASTO_MINE_TRACE_SQL to check that no
+    # one-off SQL strings sneak in.  Transactions are managed explicitly.
+    db_conn = sqlite3.connect(
+        db_filename, cached_statements=32, isolation_level=None)
+    if os.environ.get("MASTO_MINE_TRACE_SQL"):
+        db_conn.set_trace_callback(
+            lambda statement: print(statement, file=sys.stderr))
     db_cursor = db_conn.cursor()
-    # Set up the Mastodon client:
+    db_cursor.executescript(_CONNECTION_PRAGMAS)
+    # Set up the Mastodon client.  (Mastodon.py is slow to import, and only
+    # needed here, so it's imported here.)
+    from mastodon import Mastodon
     mdn_creds_filename = sys.argv[2]
     md = Mastodon(access_token=mdn_creds_filename)
 
+    # Hold the write lock from the read through the insert, so that two runs
+    # racing each other can't both claim the same move ID:
+    db_cursor.execute("BEGIN IMMEDIATE")
     db_cursor.execute(_CREATE_TABLE_QUERY)
+    db_cursor.execute(_CREATE_SNAPSHOT_TABLE_QUERY)
 
     prev_game_state = load_game_state(db_cursor, db_filename)
     game_id = prev_game_state.game_id
@@ -305,16 +465,20 @@ def main():
         None if not prev_game_state.post_id else int(prev_game_state.post_id))
     print(reply_to)
 
-    this_post_response = md.status_post(
-        status=this_post_contents,
-        visibility='public',
-        in_reply_to_id=reply_to
-    )
-    print(this_move)
-
-    update_game_state(db_cursor, game_id, this_move_id, this_move,
-                      str(this_post_response['id']))
-    db_conn.commit()
+    try:
+        this_post_response = md.status_post(
+            status=this_post_contents,
+            visibility='public',
+            in_reply_to_id=reply_to
+        )
+        print(this_move)
+        update_game_state(db_cursor, game_id, this_move_id, this_move,
+                          str(this_post_response['id']))
+        save_game_snapshot(db_cursor, game_id, this_move_id, ms_game)
+    except BaseException:
+        db_cursor.execute("ROLLBACK")
+        raise
+    db_cursor.execute("COMMIT")
     db_conn.close()
 
 
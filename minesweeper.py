@@ -10,7 +10,10 @@ play an easy board).
 TODO: Upgrade style to use snake_case for functions/methods.
 """
 
+import array
 import enum
+import functools
+import operator
 import sys
 import random
 
@@ -27,18 +30,125 @@ class CellValue(enum.Enum):
     def __int__(self):
         return self.value[2]
 
+# The board stores each cell as a signed byte: 0-8 for a dug cell's neighbor
+# count, or one of these CellValue codes.
+_UNKNOWN = int(CellValue.UNKNOWN)
+_FLAG = int(CellValue.FLAG)
+_OUT_OF_BOUNDS = int(CellValue.OUT_OF_BOUNDS)
+_MINE = int(CellValue.MINE)
+_LAVA = int(CellValue.LAVA)
+
 _NUMERIC_EMOJI = tuple(["🟫", "1️⃣", "2️⃣", "3️⃣", "4️⃣", "5️⃣", "6️⃣", "7️⃣", "8️⃣"])
+# Text and emoji to display for each board cell value.  Negative (CellValue)
+# codes index from the end of the tables, so a signed board byte can index
+# them directly.
+_CHAR_BY_CELL = [None] * 256
+_CHAR_BY_CELL[:9] = [' '] + [str(count) for count in range(1, 9)]
+_EMOJI_BY_CELL = [None] * 256
+_EMOJI_BY_CELL[:len(_NUMERIC_EMOJI)] = _NUMERIC_EMOJI
+for _cell_value in CellValue:
+    _CHAR_BY_CELL[int(_cell_value)] = _cell_value.value[0]
+    _EMOJI_BY_CELL[int(_cell_value)] = _cell_value.value[1]
+_CHAR_BY_CELL = tuple(_CHAR_BY_CELL)
+_EMOJI_BY_CELL = tuple(_EMOJI_BY_CELL)
+del _cell_value
 _TWEET_ROW_INDICES = tuple(chr(0x1d670 + i) + "  " for i in range(8))
 _TWEET_COL_HEADER = (
     "  - " + " | ".join(chr(0x1d670 + i) for i in range(8, 16)) + "\n")
 
-def _DisplayCell(cell_value, use_emoji=False):
-    """Single character to display for the given cell_value."""
-    if isinstance(cell_value, CellValue):
-        return cell_value.value[1 if use_emoji else 0]
-    if use_emoji:
-        return _NUMERIC_EMOJI[cell_value]
-    return ' ' if cell_value == 0 else str(cell_value)
+
+@functools.lru_cache
+def _BuildNeighbors(num_rows, num_cols):
+    """Per-cell tuples of the flat indices of each cell's on-board neighbors.
+
+    Only a handful of board shapes ever get played, so each is built once.
+    """
+    neighbors = []
+    for row in range(num_rows):
+        for col in range(num_cols):
+            neighbors.append(tuple(
+                drow * num_cols + dcol
+                for drow in (row - 1, row, row + 1)
+                for dcol in (col - 1, col, col + 1)
+                if (drow, dcol) != (row, col)
+                and 0 <= drow < num_rows and 0 <= dcol < num_cols))
+    return tuple(neighbors)
+
+
+def _NeighborhoodIndices(num_rows, num_cols, row, col, radius):
+    """Row-major flat indices of the window around (row, col); -1 if off-board.
+    """
+    return tuple(
+        drow * num_cols + dcol
+        if 0 <= drow < num_rows and 0 <= dcol < num_cols else -1
+        for drow in range(row - radius, row + radius + 1)
+        for dcol in range(col - radius, col + radius + 1))
+
+
+@functools.lru_cache
+def _BuildNeighborhoods(num_rows, num_cols, radius):
+    """Per-cell `_NeighborhoodIndices`, built once per board shape and radius.
+    """
+    return tuple(_NeighborhoodIndices(num_rows, num_cols, row, col, radius)
+                 for row in range(num_rows) for col in range(num_cols))
+
+
+@functools.lru_cache
+def _BuildNeighborhoodGetters(num_rows, num_cols, radius):
+    """Per-cell itemgetters over the board for windows fully on the board.
+
+    Cells whose window hangs off the edge (and every cell, at radius 0, where
+    itemgetter would return a bare int) get None instead.
+    """
+    return tuple(
+        operator.itemgetter(*indices)
+        if radius > 0 and min(indices) >= 0 else None
+        for indices in _BuildNeighborhoods(num_rows, num_cols, radius))
+
+
+def _FloodFill(board, num_neighbors, neighbors, start):
+    """Digs out everything reachable from `start`, a just-dug zero cell.
+
+    Works in place on the flat `board`, where a dug cell doubles as the
+    visited marker.  Returns the number of cells newly dug (not counting
+    `start`).
+    """
+    dug = 0
+    to_expand = [start]
+    while to_expand:
+        for nidx in neighbors[to_expand.pop()]:
+            if board[nidx] == _UNKNOWN:
+                nneigh = num_neighbors[nidx]
+                board[nidx] = nneigh
+                dug += 1
+                if nneigh == 0:
+                    to_expand.append(nidx)
+    return dug
+
+
+def _MineLayout(num_rows, num_cols, num_mines, seed):
+    """Random mine placement for a fresh board.
+
+    Returns a frozenset of the mines' flat indices, and bytes holding every
+    cell's count of neighboring mines.
+    """
+    # Choose random mine positions, without disturbing the global `random`
+    rng = random.Random(seed)
+    mine_positions = frozenset(
+        rng.sample(range(num_rows * num_cols), num_mines))
+    # Precompute number of neighboring mines for each square
+    # Start by every square thinking it has zero neighbors:
+    num_neighbors = bytearray(num_rows * num_cols)
+    # Then, for every mine, increment its neighbors' counts:
+    neighbors = _BuildNeighbors(num_rows, num_cols)
+    for mine_position in mine_positions:
+        for nidx in neighbors[mine_position]:
+            num_neighbors[nidx] += 1
+    return mine_positions, bytes(num_neighbors)
+
+
+# Replaying a stored game rebuilds its board from the seed every time.
+_SeededMineLayout = functools.lru_cache(maxsize=128)(_MineLayout)
 
 
 class MinesweeperGame(object):
@@ -53,32 +163,24 @@ class MinesweeperGame(object):
         self.num_rows = num_rows
         self.num_cols = num_cols
         self.dead = False
-        # Choose random mine positions
-        # TODO: Use a `random.Random` generator instead.
-        random.seed(seed)
-        self.mine_positions = set(
-            random.sample([(row, col) for row in range(num_rows)
-                           for col in range(num_cols)],
-                          num_mines))
-        # Precompute number of neighboring mines for each square
-        # Start by every square thinking it has zero neighbors:
-        self.num_neighbors = {(row, col): 0
-                              for row in range(num_rows)
-                              for col in range(num_cols)}
-        # Then, for every mine, increment its neighbors' counts:
-        for mine_position in self.mine_positions:
-            mrow, mcol = mine_position
-            for drow in (mrow - 1, mrow, mrow + 1):
-                for dcol in (mcol - 1, mcol, mcol + 1):
-                    if self.ValidPosition(drow, dcol):
-                        self.num_neighbors[(drow, dcol)] += 1
-        self.board = {(row, col): CellValue.UNKNOWN
-                      for row in range(num_rows)
-                      for col in range(num_cols)}
+        # Per-cell state is stored flat and row-major: the cell at (row, col)
+        # lives at index `row * num_cols + col`.
+        self._neighbors = _BuildNeighbors(num_rows, num_cols)
+        # A seeded board always gets the same mines, so only lay them out once:
+        build_layout = _MineLayout if seed is None else _SeededMineLayout
+        self.mine_positions, neighbor_counts = build_layout(
+            num_rows, num_cols, num_mines, seed)
+        self.num_neighbors = array.array('b', neighbor_counts)
+        self.board = array.array('b', [_UNKNOWN]) * (num_rows * num_cols)
+        # The game is won once this many cells have been dug:
+        self._num_safe = num_rows * num_cols - len(self.mine_positions)
         self.dug_count = 0
         self.flag_count = 0
-        # Keep track of cells dug up or flagged since the last visualization:
-        self.recently_poked = []
+        # Keep track of cells dug up or flagged since the last visualization,
+        # as flat indices:
+        self.recently_poked = array.array('i')
+        # AsEmoji's last rendering, if the board hasn't changed since:
+        self._emoji_cache = None
 
     @staticmethod
     def Beginner(seed=None):
@@ -98,9 +200,10 @@ class MinesweeperGame(object):
     def PlantFlag(self, row, col):
         if not self.ValidPosition(row, col):
             raise ValueError("Can't plant a flag outside the board")
-        self.board[(row, col)] = CellValue.FLAG
+        self.board[row * self.num_cols + col] = _FLAG
+        self._emoji_cache = None
         self.flag_count += 1
-        self.recently_poked.append((row, col))
+        self.recently_poked.append(row * self.num_cols + col)
 
     def Dig(self, row, col):
         """Returns True iff you dig a *new* hole and survive."""
@@ -109,60 +212,72 @@ class MinesweeperGame(object):
         if not self.ValidPosition(row, col):
             # sure.  just dig wherever.  no mines outside the board anyway.
             return True
-        if (row, col) in self.mine_positions:
-            self.board[(row, col)] = CellValue.MINE
+        self._emoji_cache = None
+        board = self.board
+        idx = row * self.num_cols + col
+        if idx in self.mine_positions:
+            board[idx] = _MINE
             self.dead = True
             return False
-        if self.board[(row, col)] != CellValue.UNKNOWN:
-            self.board[(row, col)] = CellValue.LAVA
+        if board[idx] != _UNKNOWN:
+            board[idx] = _LAVA
             self.dead = True
             return False
-        neighbors = self.num_neighbors[(row, col)]
-        self.board[(row, col)] = neighbors
+        neighbors = self.num_neighbors[idx]
+        board[idx] = neighbors
         # If no neighboring cells are mines, dig up all those cells, too:
         if neighbors == 0:
-            # Explore all neighbors
-            seen = set()
-            to_dig = []
-            for drow in (row - 1, row, row + 1):
-                for dcol in (col - 1, col, col + 1):
-                    if not self.ValidPosition(drow, dcol):
-                        continue
-                    if self.board[(drow, dcol)] == CellValue.UNKNOWN:
-                        to_dig.append((drow, dcol))
-            while len(to_dig) > 0:
-                nrow, ncol = to_dig.pop()
-                if (nrow, ncol) in seen:
-                    continue
-                seen.add((nrow, ncol))
-                nneigh = self.num_neighbors[(nrow, ncol)]
-                self.board[(nrow, ncol)] = nneigh
-                self.dug_count += 1
-                if nneigh == 0:
-                    for drow in (nrow - 1, nrow, nrow + 1):
-                        for dcol in (ncol - 1, ncol, ncol + 1):
-                            if not self.ValidPosition(drow, dcol):
-                                continue
-                            if self.board[(drow, dcol)] == CellValue.UNKNOWN:
-                                to_dig.append((drow, dcol))
+            self.dug_count += _FloodFill(
+                board, self.num_neighbors, self._neighbors, idx)
         self.dug_count += 1
-        self.recently_poked.append((row, col))
-        if self.Won():
-            for mrow, mcol in self.mine_positions:
-                self.board[(mrow, mcol)] = CellValue.FLAG
+        self.recently_poked.append(row * self.num_cols + col)
+        if self.dug_count == self._num_safe:
+            for mine_position in self.mine_positions:
+                board[mine_position] = _FLAG
         return True
 
+    def Snapshot(self):
+        """The board's cell values as bytes, suitable for passing to Restore."""
+        return self.board.tobytes()
+
+    def Restore(self, board, dug_count, flag_count, dead):
+        """Resumes play from a Snapshot of a game made with this game's seed.
+
+        Only the visible state is restored; the mines come from the seed, so
+        restoring a snapshot taken from a differently-seeded game is garbage.
+        """
+        if len(board) != len(self.board):
+            raise ValueError("Snapshot is the wrong size for this board")
+        self.board = array.array('b', board)
+        self.dug_count = dug_count
+        self.flag_count = flag_count
+        self.dead = bool(dead)
+        del self.recently_poked[:]
+        self._emoji_cache = None
+
     def Neighborhood(self, row, col, radius=2):
         """Row-major ordering of what the board looks like centered at (r, c)"""
         # Returns list of ints representing cell values.
-        vals = []
-        for drow in range(row - radius, row + radius + 1):
-            for dcol in range(col - radius, col + radius + 1):
-                if self.ValidPosition(drow, dcol):
-                    vals.append(int(self.board[(drow, dcol)]))
-                else:
-                    vals.append(int(CellValue.OUT_OF_BOUNDS))
-        return vals
+        if self.ValidPosition(row, col):
+            idx = row * self.num_cols + col
+            # Away from the edges, gather the whole window in one C call:
+            getter = _BuildNeighborhoodGetters(
+                self.num_rows, self.num_cols, radius)[idx]
+            if getter is not None:
+                return list(getter(self.board))
+            indices = _BuildNeighborhoods(
+                self.num_rows, self.num_cols, radius)[idx]
+        else:
+            indices = _NeighborhoodIndices(
+                self.num_rows, self.num_cols, row, col, radius)
+        board = self.board
+        return [board[idx] if idx >= 0 else _OUT_OF_BOUNDS for idx in indices]
+
+    def UndugCells(self):
+        """Row-major (row, col)s of cells that are neither dug nor flagged."""
+        return [divmod(idx, self.num_cols)
+                for idx, cell_value in enumerate(self.board)
+                if cell_value == _UNKNOWN]
 
     def NumFlagged(self):
         return self.flag_count
@@ -178,61 +293,47 @@ class MinesweeperGame(object):
 
     def Won(self):
         # WARNING!! IGNORES FLAGS!!
-        return (len(self.board) - self.dug_count) == self.NumMinesTotal()
+        return self.dug_count == self._num_safe
 
     def Print(self, include_ticks=False):
-        print(f"Dig Count: {self.dug_count}")
-        print(f"Mines: {self.NumMinesTotal()}\n")
-        # Print a row of ticks above the board:
+        # The whole frame is assembled first, then written in one go.
+        parts = [f"Dig Count: {self.dug_count}\n",
+                 f"Mines: {self.NumMinesTotal()}\n\n"]
+        tick_width = len(str(self.num_rows))
         if include_ticks:
-            print(" " * (len(str(self.num_rows)) + 2), end='')
-            col = 0
-            out_str = ""
-            while col < self.num_cols:
-                if col % 3 == 0:
-                    addition = str(col)
-                    if len(addition) == 1:
-                        addition += ' '
-                else:
-                    addition = '  '
-                out_str += addition
-                col += 1
-            print(out_str, end='\n')
+            tick_row = (" " * (tick_width + 2) +
+                        "".join(str(col).ljust(2) if col % 3 == 0 else "  "
+                                for col in range(self.num_cols)) + "\n")
+            # Print a row of ticks above the board:
+            parts.append(tick_row)
         for row in range(self.num_rows):
             # Print a single tick to the left of the board:
             if include_ticks:
-                n = len(str(self.num_rows))
-                print(("%d" % (row,)).rjust(n), end='  ')
-            for col in range(self.num_cols):
-                cell_value = self.board[(row, col)]
-                ch = _DisplayCell(cell_value)
-                print(ch, end=' ')
-            print('')
+                parts.append(str(row).rjust(tick_width) + "  ")
+            parts.append(" ".join(map(
+                _CHAR_BY_CELL.__getitem__,
+                self.board[row * self.num_cols:(row + 1) * self.num_cols])))
+            parts.append(" \n")
         # Print a row of ticks below the board:
         if include_ticks:
-            print(" " * (len(str(self.num_rows)) + 2), end='')
-            col = 0
-            out_str = ""
-            while col < self.num_cols:
-                if col % 3 == 0:
-                    addition = str(col)
-                    if len(addition) == 1:
-                        addition += ' '
-                else:
-                    addition = '  '
-                out_str += addition
-                col += 1
-            print(out_str, end='\n')
-        self.recently_poked = []
+            parts.append(tick_row)
+        sys.stdout.write("".join(parts))
+        del self.recently_poked[:]
 
     def AsEmoji(self):
         """Returns a game board rendered as emoji."""
-        tweet_board = _TWEET_COL_HEADER
+        if self._emoji_cache is not None:
+            return self._emoji_cache
+        parts = [_TWEET_COL_HEADER]
         for row_id in range(self.num_rows):
-            row = [_DisplayCell(self.board[(row_id, col_id)], use_emoji=True)
-                   for col_id in range(self.num_cols)]
-            tweet_board += (_TWEET_ROW_INDICES[row_id] + "".join(row) + "\n")
-        return tweet_board
+            parts.append(_TWEET_ROW_INDICES[row_id])
+            parts.extend(map(
+                _EMOJI_BY_CELL.__getitem__,
+                self.board[row_id * self.num_cols:
+                           (row_id + 1) * self.num_cols]))
+            parts.append("\n")
+        self._emoji_cache = "".join(parts)
+        return self._emoji_cache
 
 
 if __name__ == "__main__":
@@ -253,7 +354,7 @@ if __name__ == "__main__":
         row = int(input("Row: "))
         col = int(input("Col: "))
         print(f"Move {moves}: [{row}, {col}]:", end=" ")
-        print(ms_game.num_neighbors[(row, col)])
+        print(ms_game.num_neighbors[row * ms_game.num_cols + col])
         if not ms_game.Dig(row, col):
             print("   DIED!!\n")
         else:
@@ -24,6 +24,19 @@ $ python tweet_mine.py \
     gridpoint
 ```
 
+Or keep one job running, with its DB connections and Twitter session warm,
+and send it each move with `tweet_mine_client.py`:
+
+```
+$ python tweet_mine.py --daemon /tmp/tweet_mine.sock
+$ python tweet_mine_client.py /tmp/tweet_mine.sock \
+    sqilte_file123.db \
+    oauth_config.json \
+    player \
+    command \
+    gridpoint
+```
+
 See `doc/tweet_mine.md` for full details.
 """
 
@@ -31,23 +44,69 @@ from __future__ import annotations
 
 import dataclasses
 import enum
-import json
+import functools
+import logging
 import minesweeper
+import os
+import re
 import requests
 import requests_oauthlib
+import signal
+import socketserver
 import sqlite3
+import stat
 import sys
 
-from collections.abc import Sequence
+from collections.abc import Iterable, Sequence
+from concurrent import futures
+from requests import adapters
+from urllib3.util import retry
 
+try:
+    # orjson parses bytes straight to str objects in C; fall back if missing.
+    from orjson import loads as _json_loads
+except ImportError:
+    from json import loads as _json_loads
+
+
+_LOGGER = logging.getLogger(__name__)
 
 # ASCII form of the game board's row and column header letters:
 _ROW_HEADERS = ('a', 'b', 'c', 'd', 'e', 'f', 'g', 'h')
 _COL_HEADERS = ('i', 'j', 'k', 'l', 'n', 'q', 'r', 't')
+# ...and the other way around, from header letter to row/column index:
+_ROW_INDEX = {ch: i for i, ch in enumerate(_ROW_HEADERS)}
+_COL_INDEX = {ch: i for i, ch in enumerate(_COL_HEADERS)}
+# ...and as they're spelled in tweets:
+_ROW_HEADERS_UPPER = tuple(ch.upper() for ch in _ROW_HEADERS)
+_COL_HEADERS_UPPER = tuple(ch.upper() for ch in _COL_HEADERS)
+
+# Everything in the DB file name that isn't part of the game number:
+_NON_DIGITS = re.compile(r"\D")
 
 # Where to send tweets:
 POST_TWEET_URL = 'https://api.twitter.com/1.1/statuses/update.json'
 
+
+def _twitter_session() -> requests.Session:
+    """A keep-alive session, retrying Twitter's transient failures.
+
+    POSTs are retried too: Twitter refuses a duplicate status, so a retry
+    can't double-post a move.  (A 500 isn't retried, since the tweet may
+    well have gone out.)
+    """
+    session = requests.Session()
+    session.mount('https://', adapters.HTTPAdapter(
+        pool_connections=1, pool_maxsize=1,
+        max_retries=retry.Retry(
+            total=3, backoff_factor=0.5,
+            status_forcelist=(429, 502, 503, 504),
+            allowed_methods=None, raise_on_status=False)))
+    return session
+
+
+_SESSION = _twitter_session()
+
 _CREATE_TABLE_QUERY = """
     CREATE TABLE game_state (
         move_id integer,
@@ -58,33 +117,103 @@ _CREATE_TABLE_QUERY = """
     );
 """
 
+# Each run commits one move and exits: WAL journaling with NORMAL sync keeps
+# that commit to a sequential append instead of a rollback-journal fsync pair.
+# The mmap_size is only a ceiling on how much of the (tiny) file SQLite maps
+# to read pages from, in place of read syscalls; nothing is reserved up front.
+_CONNECTION_PRAGMAS = """
+    PRAGMA journal_mode=WAL;
+    PRAGMA synchronous=NORMAL;
+    PRAGMA temp_store=MEMORY;
+    PRAGMA mmap_size=67108864;
+    PRAGMA cache_size=-2000;
+    PRAGMA cache_spill=OFF;
+"""
+
+# The seed used to place this game's mines, recorded when the game is created
+# so the board survives the DB file being renamed.
+_CREATE_SEED_TABLE_QUERY = """
+    CREATE TABLE game_seed (
+        seed text
+    );
+"""
+
+_INSERT_SEED_QUERY = "INSERT INTO game_seed (seed) VALUES (?);"
+
+_FETCH_SEED_QUERY = "SELECT seed FROM game_seed;"
+
+# The board after each move, so the next run needn't replay every move before
+# it.  `board` holds `MinesweeperGame.Snapshot()` bytes.  (Games created
+# before this table existed get it on their next move.)
+_CREATE_SNAPSHOT_TABLE_QUERY = """
+    CREATE TABLE IF NOT EXISTS game_snapshot (
+        move_id INTEGER PRIMARY KEY,
+        board BLOB NOT NULL,
+        dug_count INTEGER NOT NULL,
+        flag_count INTEGER NOT NULL,
+        dead INTEGER NOT NULL
+    );
+"""
+
+_SAVE_SNAPSHOT_QUERY = """
+    INSERT OR REPLACE INTO game_snapshot (
+        move_id, board, dug_count, flag_count, dead)
+    VALUES (?, ?, ?, ?, ?);
+"""
+
+_LOAD_SNAPSHOT_QUERY = """
+    SELECT board, dug_count, flag_count, dead
+    FROM game_snapshot
+    WHERE move_id = ?;
+"""
+
 _UPDATE_STATE_QUERY = """
     INSERT INTO game_state (
         move_id, command, gridpoint_row, gridpoint_col, tweet_id)
     VALUES (?, ?, ?, ?, ?);
 """
 
+# Everything needed to sanity-check the moves on file, in one pass.  (With a
+# single MAX aggregate, SQLite takes the bare `tweet_id` from the latest move.)
+_CHECK_GAME_MOVES_QUERY = """
+    SELECT
+        COUNT(*),
+        COUNT(DISTINCT move_id),
+        MAX(move_id),
+        tweet_id,
+        SUM(move_id < 0),
+        SUM(UPPER(command) NOT IN ('NEW', 'DIG', 'FLAG')),
+        SUM(move_id = 0 AND UPPER(command) != 'NEW')
+    FROM game_state;
+"""
+
+# The moves to replay, in order; move 0 is always a no-op NEW.
 _FETCH_GAME_MOVES_QUERY = """
     SELECT
-        move_id,
         command,
         gridpoint_row,
-        gridpoint_col,
-        tweet_id
+        gridpoint_col
     FROM game_state
+    WHERE move_id > 0
     ORDER BY move_id;
 """
 
-_WELCOME_TWEET_TEMPLATE = """It's #Minesweeper, Game {game_num}!
-Reply with 'dig A,K' or 'flag D,Q'.
-"""
+# The tweet texts, as f-strings, so there's no format spec to parse per call:
+def _welcome_tweet_header(game_num: int) -> str:
+    return (f"It's #Minesweeper, Game {game_num}!\n"
+            "Reply with 'dig A,K' or 'flag D,Q'.\n")
 
-_MOVE_TWEET_TEMPLATE = """#Minesweeper Game {game_num}, Move {move_num}:
-@{player} says: '{cmd} at {row}, {col}!'
-{results}
-"""
 
-_COUNTS_TEMPLATE = "Mines: {num_mines} ({num_flags} flag{flag_plural}):\n"
+def _move_tweet_header(game_num: int, move_num: int, player: str, cmd: str,
+                       row: str, col: str, results: str) -> str:
+    return (f"#Minesweeper Game {game_num}, Move {move_num}:\n"
+            f"@{player} says: '{cmd} at {row}, {col}!'\n"
+            f"{results}\n")
+
+
+def _counts_line(num_mines: int, num_flags: int) -> str:
+    flag_plural = "" if num_flags == 1 else "s"
+    return f"Mines: {num_mines} ({num_flags} flag{flag_plural}):\n"
 
 
 @enum.unique
@@ -95,6 +224,16 @@ class Command(enum.Enum):
     FLAG = 'FLAG'
 
 
+# The DB stores commands by upper-cased name:
+_COMMAND_BY_NAME = {command.name: command for command in Command}
+
+# How to apply each kind of move to a game:
+_APPLY_MOVE = {
+    Command.DIG: minesweeper.MinesweeperGame.Dig,
+    Command.FLAG: minesweeper.MinesweeperGame.PlantFlag,
+}
+
+
 @dataclasses.dataclass(frozen=True)
 class CommandLineFlags():
     """Instructions passed in to this job at runtime, lightly parsed."""
@@ -104,22 +243,25 @@ class CommandLineFlags():
     command: Command
     gridpoint_row: int  # If digging or flagging, must be in range [0, 7]
     gridpoint_col: int  # If digging or flagging, must be in range [0, 7]
+    # Parsed out of `sqlite_filename` once, in __post_init__:
+    _game_num: int = dataclasses.field(init=False, repr=False, compare=False)
 
     def __post_init__(self):
         try:
-            self.game_num()
+            game_num = int(_NON_DIGITS.sub("", self.sqlite_filename))
         except ValueError:
             raise ValueError(f"No digits found in {self.sqlite_filename}")
-        if self.command is not Command.NEW:
-            if self.gridpoint_row < 0 or self.gridpoint_row > 8:
-                raise ValueError(
-                    f"gridpoint_row out of bounds: {self.gridpoint_row}")
-            if self.gridpoint_col < 0 or self.gridpoint_col > 8:
-                raise ValueError(
-                    f"gridpoint_row out of bounds: {self.gridpoint_col}")
+        # (The dataclass is frozen, so set this field the long way.)
+        object.__setattr__(self, "_game_num", game_num)
+        if self.command is not Command.NEW and not (
+                0 <= self.gridpoint_row < len(_ROW_HEADERS) and
+                0 <= self.gridpoint_col < len(_COL_HEADERS)):
+            raise ValueError(
+                f"Gridpoint out of bounds: row {self.gridpoint_row}, "
+                f"col {self.gridpoint_col}")
 
     def game_num(self) -> int:
-        return int("".join(ch for ch in self.sqlite_filename if ch.isdigit()))
+        return self._game_num
 
     @classmethod
     def from_argv(cls, argv: Sequence[str]) -> CommandLineFlags:
@@ -128,22 +270,29 @@ class CommandLineFlags():
             raise ValueError(
                 f"Incorrect number of command line arguments: {argv}")
         _, sqlfile, oauthfile, player, cmd_str, grid = argv
-        try:
-            command = Command[cmd_str.upper()]
-        except KeyError:
+        command = _COMMAND_BY_NAME.get(cmd_str.upper())
+        if command is None:
             raise ValueError(f'Invalid command arg: {cmd_str}')
         if command is Command.NEW:
             g_row = -1
             g_col = -1
         else:
+            # Checked up front, since connecting would create an empty file:
+            if not os.path.exists(sqlfile):
+                raise FileNotFoundError(
+                    f"No game DB at {sqlfile}; start the game with 'new' "
+                    "first")
             if len(grid) != 3:
                 raise ValueError(f"Invalid gridpoint arg: {grid} (bad length)")
             if grid[1] != ",":
                 raise ValueError(
                     f"Invalid gridpoint arg: {grid} (missing comma)")
-            row_ch, col_ch = grid.lower().split(",")
-            g_row = _ROW_HEADERS.index(row_ch)
-            g_col = _COL_HEADERS.index(col_ch)
+            try:
+                g_row = _ROW_INDEX[grid[0].lower()]
+                g_col = _COL_INDEX[grid[2].lower()]
+            except KeyError:
+                raise ValueError(
+                    f"Invalid gridpoint arg: {grid} (unknown row or column)")
         return CommandLineFlags(
             sqlite_filename=sqlfile,
             oauth_config_filename=oauthfile,
@@ -155,8 +304,17 @@ class CommandLineFlags():
 
 
 def oauth_from_config_file(config_filename: str) -> requests_oauthlib.OAuth1:
-    with open(config_filename) as infile:
-        config = json.load(infile)
+    """Loads OAuth credentials, reusing the parsed file until it changes."""
+    return _oauth_from_config_file(
+        config_filename, os.path.getmtime(config_filename))
+
+
+@functools.lru_cache(maxsize=4)
+def _oauth_from_config_file(config_filename: str,
+                            mtime: float) -> requests_oauthlib.OAuth1:
+    # `mtime` is only here as part of the cache key.
+    with open(config_filename, 'rb') as infile:
+        config = _json_loads(infile.read())
     return requests_oauthlib.OAuth1(
         client_key=config['consumer_key'],
         client_secret=config['consumer_secret'],
@@ -165,14 +323,36 @@ def oauth_from_config_file(config_filename: str) -> requests_oauthlib.OAuth1:
     )
 
 
-def initialize_game_state(db_cursor: sqlite3.Cursor) -> None:
-    """Creates the game state table, or dies trying."""
+def default_game_seed(sqlite_filename: str) -> str:
+    """The mine-placement seed for a new game stored in this DB file."""
+    return 'A super secret salt; no peeking ' + sqlite_filename
+
+
+def initialize_game_state(db_cursor: sqlite3.Cursor, seed: str) -> None:
+    """Creates the game state and seed tables, or dies trying."""
     try:
         db_cursor.execute(_CREATE_TABLE_QUERY)
+        db_cursor.execute(_CREATE_SEED_TABLE_QUERY)
     except sqlite3.OperationalError as op_err:
         raise RuntimeError(
         "Seems like you tried initializing a game via 'NEW' on a DB file"
         "that already has a game going.") from op_err
+    db_cursor.execute(_INSERT_SEED_QUERY, (seed,))
+
+
+def load_game_seed(db_cursor: sqlite3.Cursor, sqlite_filename: str) -> str:
+    """Fetches the seed this game was created with.
+
+    Games created before the seed was stored fall back to the seed derived
+    from the DB file name, which is what they were created with.
+    """
+    try:
+        row = db_cursor.execute(_FETCH_SEED_QUERY).fetchone()
+    except sqlite3.OperationalError:
+        row = None
+    if row is None:
+        return default_game_seed(sqlite_filename)
+    return row[0]
 
 
 def load_game_state(db_cursor: sqlite3.Cursor,
@@ -190,57 +370,65 @@ def load_game_state(db_cursor: sqlite3.Cursor,
         First element: The next move ID expected to be inserted.
         Second element: The tweet ID corresponding to the last move.
     """
-    db_cursor.execute(_FETCH_GAME_MOVES_QUERY)  # Note: this ORDERS BY move_id
-    for expected_move_id, row in enumerate(db_cursor.fetchall()):
-        move_id, cmd_str, g_row, g_col, tw_id = row
-        # Ensure the move IDs are consecutive integers starting at 0:
-        if move_id != expected_move_id:
-            raise ValueError(
-                f"Expected move ID of {expected_move_id}"
-                f"but got a row like {row}"
-            )
-        # Parse the command into the nice enum version:
-        try:
-            command = Command[cmd_str.upper()]
-        except KeyError:
-            raise ValueError(f"Unrecognized command in row {row}")
-        # The first move ("move 0") is always a no-op of NEW:
-        if move_id == 0:
-            if command is not Command.NEW:
-                raise ValueError(f"Move 0 must have command NEW; got row {row}")
-            continue
-        apply_move(ms_game, command, gridpoint_row=g_row, gridpoint_col=g_col)
-        if ms_game.Dead():
-            raise RuntimeError("This game already ended (in death)!")
-        if ms_game.Won():
-            raise RuntimeError("This game already ended (in victory)!")
-    return (move_id + 1, tw_id)
+    (num_moves, num_move_ids, max_move_id, last_tweet_id, num_negative_ids,
+     num_bad_commands, num_bad_first_moves) = db_cursor.execute(
+        _CHECK_GAME_MOVES_QUERY).fetchone()
+    if num_moves == 0:
+        raise ValueError("No moves on file; start the game with 'new' first")
+    # Ensure the move IDs are consecutive integers starting at 0:
+    if (num_negative_ids or num_move_ids != num_moves
+            or max_move_id != num_moves - 1):
+        raise ValueError(
+            f"Expected move IDs 0 through {num_moves - 1}, but got "
+            f"{num_move_ids} distinct IDs up to {max_move_id}")
+    if num_bad_commands:
+        raise ValueError(f"Found {num_bad_commands} unrecognized commands")
+    # The first move ("move 0") is always a no-op of NEW:
+    if num_bad_first_moves:
+        raise ValueError("Move 0 must have command NEW")
+    # If the last move's board was saved, there's no need to replay the moves:
+    snapshot = db_cursor.execute(
+        _LOAD_SNAPSHOT_QUERY, (max_move_id,)).fetchone()
+    if snapshot is not None:
+        ms_game.Restore(*snapshot)
+        _check_game_ongoing(ms_game)
+    else:
+        for cmd_str, g_row, g_col in db_cursor.execute(
+                _FETCH_GAME_MOVES_QUERY):
+            apply_move(ms_game, _COMMAND_BY_NAME[cmd_str.upper()],
+                       gridpoint_row=g_row, gridpoint_col=g_col)
+            _check_game_ongoing(ms_game)
+    return (num_moves, last_tweet_id)
+
+
+def _check_game_ongoing(ms_game: minesweeper.MinesweeperGame) -> None:
+    """Raises RuntimeError if there's no more playing this game."""
+    if ms_game.Dead():
+        raise RuntimeError("This game already ended (in death)!")
+    if ms_game.Won():
+        raise RuntimeError("This game already ended (in victory)!")
 
 
 def apply_move(ms_game: minesweeper.MinesweeperGame, command: Command,
                gridpoint_row: int, gridpoint_col: int) -> None:
     """Updates ms_game according to given command."""
-    if command is Command.DIG:
-        ms_game.Dig(gridpoint_row, gridpoint_col)
-    elif command is Command.FLAG:
-        ms_game.PlantFlag(gridpoint_row, gridpoint_col)
-    else:
+    move_fn = _APPLY_MOVE.get(command)
+    if move_fn is None:
         raise ValueError(f"Unsupported apply_move command: {command}")
+    move_fn(ms_game, gridpoint_row, gridpoint_col)
 
 
-def welcome_tweet_contents(job_flags: CommandLineFlags,
+def welcome_tweet_contents(job_flags: CommandLineFlags, game_num: int,
                            ms_game: minesweeper.MinesweeperGame) -> str:
     """What to tweet when starting a game."""
-    return (_WELCOME_TWEET_TEMPLATE.format(game_num=job_flags.game_num()) +
-            _COUNTS_TEMPLATE.format(
-                num_mines=ms_game.NumMinesTotal(),
-                num_flags=ms_game.NumFlagged(),
-                flag_plural=("" if ms_game.NumFlagged() == 1 else "s")) +
+    return (_welcome_tweet_header(game_num) +
+            _counts_line(ms_game.NumMinesTotal(), ms_game.NumFlagged()) +
             "\n" +
             ms_game.AsEmoji())
 
 
-def move_result_tweet_contents(job_flags: CommandLineFlags, move_id: int,
+def move_result_tweet_contents(job_flags: CommandLineFlags, game_num: int,
+                               move_id: int,
                                ms_game: minesweeper.MinesweeperGame) -> str:
     """What to tweet when you've just made a move in the game."""
     if ms_game.Dead():
@@ -248,86 +436,244 @@ def move_result_tweet_contents(job_flags: CommandLineFlags, move_id: int,
     elif ms_game.Won():
         results = "🎉 YOU WIN! 🎉\n"
     else:
-        results = _COUNTS_TEMPLATE.format(
-            num_mines=ms_game.NumMinesTotal(), num_flags=ms_game.NumFlagged(),
-            flag_plural=("" if ms_game.NumFlagged() == 1 else "s"))
-    return (_MOVE_TWEET_TEMPLATE.format(
-                game_num=job_flags.game_num(),
+        results = _counts_line(ms_game.NumMinesTotal(), ms_game.NumFlagged())
+    return (_move_tweet_header(
+                game_num=game_num,
                 move_num=move_id,
                 player=job_flags.player,
                 cmd=job_flags.command.name,
-                row=_ROW_HEADERS[job_flags.gridpoint_row].upper(),
-                col=_COL_HEADERS[job_flags.gridpoint_col].upper(),
+                row=_ROW_HEADERS_UPPER[job_flags.gridpoint_row],
+                col=_COL_HEADERS_UPPER[job_flags.gridpoint_col],
                 results=results
             ) +
             ms_game.AsEmoji())
 
 
-def get_tweet_contents(job_flags: CommandLineFlags, move_id: int,
+def get_tweet_contents(job_flags: CommandLineFlags, game_num: int,
+                       move_id: int,
                        ms_game: minesweeper.MinesweeperGame) -> str:
     """What to tweet, for any occasion."""
     if move_id == 0:
-        return welcome_tweet_contents(job_flags, ms_game)
-    return move_result_tweet_contents(job_flags, move_id, ms_game)
+        return welcome_tweet_contents(job_flags, game_num, ms_game)
+    return move_result_tweet_contents(job_flags, game_num, move_id, ms_game)
 
 
-def update_game_state(db_cursor: sqlite3.Cursor,
-                      move_id: int,
-                      command: Command,
-                      gridpoint_row: int,
-                      gridpoint_col: int,
-                      tweet_id: str) -> None:
-    """Updates the DB's game state table with the latest move."""
-    db_cursor.execute(
+def update_game_state(
+        db_cursor: sqlite3.Cursor,
+        moves: Iterable[tuple[int, Command, int, int, str]]) -> None:
+    """Updates the DB's game state table with the latest moves.
+
+    The moves are inserted in one batch; the caller owns the transaction.
+
+    Args:
+        db_cursor: A cursor pointing to the game state database.
+        moves: (move_id, command, gridpoint_row, gridpoint_col, tweet_id)
+            tuples, one per move, in move order.
+    """
+    db_cursor.executemany(
         _UPDATE_STATE_QUERY,
-        (move_id, command.name, gridpoint_row, gridpoint_col, tweet_id)
+        ((move_id, command.name, gridpoint_row, gridpoint_col, tweet_id)
+         for move_id, command, gridpoint_row, gridpoint_col, tweet_id in moves)
     )
 
 
+def save_game_snapshot(db_cursor: sqlite3.Cursor, move_id: int,
+                       ms_game: minesweeper.MinesweeperGame) -> None:
+    """Saves the board as it stands after this move.  Doesn't commit."""
+    db_cursor.execute(
+        _SAVE_SNAPSHOT_QUERY,
+        (move_id, ms_game.Snapshot(), ms_game.dug_count,
+         ms_game.NumFlagged(), int(ms_game.Dead())))
+
+
 def main():
+    # Set TWEET_MINE_LOG=DEBUG to see each tweet before it's sent.
+    logging.basicConfig(level=os.environ.get("TWEET_MINE_LOG", "INFO"))
+    if len(sys.argv) == 3 and sys.argv[1] == "--daemon":
+        serve(socket_path=sys.argv[2])
+        return
     flags = CommandLineFlags.from_argv(sys.argv)
-    oauth = oauth_from_config_file(flags.oauth_config_filename)
+    db_conn = _connect(flags.sqlite_filename)
+    try:
+        play_move(flags, db_conn)
+    finally:
+        db_conn.close()
+
+
+def _connect(sqlite_filename: str) -> sqlite3.Connection:
+    """Opens the game DB; transactions are managed explicitly."""
+    db_conn = sqlite3.connect(sqlite_filename, isolation_level=None)
+    if sqlite_filename != ":memory:":
+        db_conn.executescript(_CONNECTION_PRAGMAS)
+    return db_conn
+
+
+def play_move(flags: CommandLineFlags, db_conn: sqlite3.Connection) -> str:
+    """Plays, tweets, and commits the move in `flags`; returns its tweet ID."""
+    # The credentials aren't needed until it's time to tweet, so read them
+    # while the DB work happens:
+    executor = futures.ThreadPoolExecutor(max_workers=1)
+    oauth_future = executor.submit(
+        oauth_from_config_file, flags.oauth_config_filename)
+    executor.shutdown(wait=False)
 
-    db_conn = sqlite3.connect(flags.sqlite_filename)
+    # The whole move is one transaction.
     db_cursor = db_conn.cursor()
-    hash_target = 'A super secret salt; no peeking ' + flags.sqlite_filename
-    ms_game = minesweeper.MinesweeperGame.Beginner(seed=hash_target)
+    db_cursor.execute("BEGIN IMMEDIATE")
+    try:
+        tweet_id = _play_move(flags, oauth_future, db_cursor)
+    except BaseException:
+        # Nothing is kept if the move didn't get tweeted -- not even the
+        # tables from a 'new', so that command can simply be rerun.
+        db_cursor.execute("ROLLBACK")
+        raise
+    db_cursor.execute("COMMIT")
+    return tweet_id
+
+
+class _MoveHandler(socketserver.StreamRequestHandler):
+    """Plays one move sent by `tweet_mine_client.py`.
+
+    The client sends its command line as a JSON list on one line, and gets
+    back one line: "OK <tweet ID>" or "ERROR <message>".
+    """
+
+    def handle(self):
+        try:
+            flags = CommandLineFlags.from_argv(
+                _json_loads(self.rfile.readline()))
+            tweet_id = play_move(
+                flags, self.server.connection(flags.sqlite_filename))
+            reply = f"OK {tweet_id}\n"
+        except Exception as err:
+            _LOGGER.exception("Move failed")
+            # The reply is one line, so the message has to be too:
+            reply = f"ERROR {' '.join(str(err).splitlines())}\n"
+        self.wfile.write(reply.encode())
+
+
+class _MoveServer(socketserver.UnixStreamServer):
+    """Serves moves one at a time, keeping each game's DB connection open."""
+
+    def __init__(self, socket_path: str):
+        # Set before binding: a failed bind calls server_close() right away.
+        # Each connection is kept with the (st_dev, st_ino) of the file it
+        # opened, to notice that file being deleted or replaced.
+        self._connections: dict[
+            str, tuple[sqlite3.Connection, tuple[int, int] | None]] = {}
+        self._bound = False
+        super().__init__(socket_path, _MoveHandler)
+
+    def server_bind(self):
+        # A daemon that died without cleaning up leaves its socket file behind:
+        try:
+            if stat.S_ISSOCK(os.stat(self.server_address).st_mode):
+                os.remove(self.server_address)
+        except FileNotFoundError:
+            pass
+        super().server_bind()
+        self._bound = True
+
+    def connection(self, sqlite_filename: str) -> sqlite3.Connection:
+        cached = self._connections.get(sqlite_filename)
+        if cached is not None:
+            db_conn, file_id = cached
+            if (sqlite_filename == ":memory:" or
+                    _file_identity(sqlite_filename) == file_id):
+                return db_conn
+            # Still open on a file that's since been deleted or replaced:
+            db_conn.close()
+        db_conn = _connect(sqlite_filename)
+        self._connections[sqlite_filename] = (
+            db_conn, _file_identity(sqlite_filename))
+        return db_conn
+
+    def server_close(self):
+        for db_conn, _ in self._connections.values():
+            db_conn.close()
+        self._connections.clear()
+        super().server_close()
+        if self._bound:
+            self._bound = False
+            os.remove(self.server_address)
+
+
+def _file_identity(filename: str) -> tuple[int, int] | None:
+    """The (st_dev, st_ino) of `filename`, or None if it doesn't exist."""
+    try:
+        file_stat = os.stat(filename)
+    except FileNotFoundError:
+        return None
+    return (file_stat.st_dev, file_stat.st_ino)
+
+
+def serve(socket_path: str) -> None:
+    """Plays moves sent to `socket_path` until interrupted.
+
+    File names sent by the client are opened relative to this process's
+    working directory, just as if they'd been passed on its command line.
+    """
+    server = _MoveServer(socket_path)
+    try:
+        # Stop on a plain `kill` the same way as on Ctrl-C, cleaning up below.
+        signal.signal(signal.SIGTERM, _exit_on_signal)
+        _LOGGER.info("Listening for moves on %s", socket_path)
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def _exit_on_signal(signum, frame):
+    _LOGGER.info("Stopping on signal %d", signum)
+    raise SystemExit(0)
+
 
+def _play_move(flags: CommandLineFlags, oauth_future: futures.Future,
+               db_cursor: sqlite3.Cursor) -> str:
+    """Plays, tweets, and records the move in `flags`; returns its tweet ID."""
     # Start with default values corresponding to a new game:
     this_move_id = 0
     last_tweet_id = None
+    db_cursor.execute(_CREATE_SNAPSHOT_TABLE_QUERY)
     if flags.command is Command.NEW:
-        initialize_game_state(db_cursor)
-        db_conn.commit()
+        seed = default_game_seed(flags.sqlite_filename)
+        initialize_game_state(db_cursor, seed)
+        ms_game = minesweeper.MinesweeperGame.Beginner(seed=seed)
     else:
+        seed = load_game_seed(db_cursor, flags.sqlite_filename)
+        ms_game = minesweeper.MinesweeperGame.Beginner(seed=seed)
         this_move_id, last_tweet_id = load_game_state(db_cursor, ms_game)
         # Update these values away from the "new game" defaults:
         apply_move(ms_game, flags.command, flags.gridpoint_row,
                    flags.gridpoint_col)
 
-    tweet_contents = get_tweet_contents(flags, this_move_id, ms_game)
-    print(len(tweet_contents))
-    print(tweet_contents)
+    tweet_contents = get_tweet_contents(
+        flags, flags.game_num(), this_move_id, ms_game)
+    _LOGGER.debug("Tweeting %d characters:\n%s",
+                  len(tweet_contents), tweet_contents)
     request_data = {'status': tweet_contents}
     if last_tweet_id is not None:
         request_data['in_reply_to_status_id'] = last_tweet_id
         request_data['auto_populate_reply_metadata'] = True
-    resp = requests.post(url=POST_TWEET_URL, data=request_data, auth=oauth)
+    resp = _SESSION.post(url=POST_TWEET_URL, data=request_data,
+                         auth=oauth_future.result())
     if not resp.ok:
-        print(resp.text)
+        _LOGGER.error("Tweeting failed: %s", resp.text)
     resp.raise_for_status()
-    this_tweet_id = resp.json().get('id_str', None)
-    print(f'Twitter response: {resp.status_code} {resp.reason};',
-          f'Tw. ID {this_tweet_id}')
+    this_tweet_id = _json_loads(resp.content).get('id_str', None)
+    _LOGGER.info("Twitter response: %s %s; Tw. ID %s",
+                 resp.status_code, resp.reason, this_tweet_id)
     if this_tweet_id is None:
-        print(resp.text)
+        _LOGGER.error("No tweet ID in response: %s", resp.text)
         raise RuntimeError("For some reason, tweeting failed!!")
 
-    update_game_state(db_cursor, this_move_id, flags.command,
-                      flags.gridpoint_row, flags.gridpoint_col,
-                      this_tweet_id)
-    db_conn.commit()
-    db_conn.close()
+    update_game_state(db_cursor, [(this_move_id, flags.command,
+                                   flags.gridpoint_row, flags.gridpoint_col,
+                                   this_tweet_id)])
+    save_game_snapshot(db_cursor, this_move_id, ms_game)
+    return this_tweet_id
 
 
 if __name__ == "__main__":
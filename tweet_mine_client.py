@@ -0,0 +1,34 @@
+"""Sends one move to a `tweet_mine.py --daemon` job, and waits for the tweet.
+
+Usage:
+
+    $ python tweet_mine_client.py /tmp/tweet_mine.sock \
+        sqilte_file123.db oauth_config.json player command gridpoint
+
+Everything after the socket path is just what you'd pass to `tweet_mine.py`
+itself.  Exits nonzero if the daemon couldn't play the move.
+"""
+
+import json
+import socket
+import sys
+
+
+def main():
+    if len(sys.argv) < 2:
+        raise ValueError(f"Missing socket path: {sys.argv}")
+    socket_path = sys.argv[1]
+    # The daemon parses this exactly like tweet_mine.py's own sys.argv:
+    request = json.dumps([sys.argv[0]] + sys.argv[2:]) + "\n"
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(socket_path)
+        sock.sendall(request.encode())
+        with sock.makefile("r", encoding="utf-8") as reply_file:
+            reply = reply_file.readline().rstrip("\n")
+    print(reply)
+    if not reply.startswith("OK "):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()